@@ -11,13 +11,29 @@ The report includes:
 from __future__ import annotations
 
 import argparse
+import json
 import textwrap
 from datetime import date
 from pathlib import Path
 
 import pandas as pd
-from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+
+# Only the tail of the captured run log is printed, split across pages.
+# 40 lines of 10pt monospace text fills the area below the page title.
+TERMINAL_OUTPUT_MAX_CHARS = 16_000
+TERMINAL_LINES_PER_PAGE = 40
+
+# Declared column types for sgov_rf_6m.csv so pandas skips type inference.
+FULL_CSV_DTYPES = {
+    "daily_log_return": "float32",
+    "rf_6m_log_raw": "float32",
+    "rf_6m_simple_raw": "float32",
+    "rf_6m_simple_clipped": "float32",
+}
 
 
 def parse_args() -> argparse.Namespace:
@@ -57,13 +73,20 @@ def require_file(path: Path) -> Path:
 def _wrapped(lines: list[str], width: int = 100) -> str:
     chunks: list[str] = []
     for line in lines:
-        wrapped = textwrap.fill(line, width=width)
-        chunks.append(wrapped)
+        # Most lines fit as-is; only hand long prose lines to textwrap.
+        if len(line) <= width:
+            chunks.append(line)
+        elif " " in line:
+            chunks.append(textwrap.fill(line, width=width))
+        else:
+            chunks.append("\n".join(line[i : i + width] for i in range(0, len(line), width)))
     return "\n".join(chunks)
 
 
-def page_overview(pdf: PdfPages, author: str, declaration: str, latest_date: str, latest_value: float) -> None:
-    fig = plt.figure(figsize=(11, 8.5))
+def page_overview(
+    pdf: PdfPages, fig: Figure, author: str, declaration: str, latest_date: str, latest_value: float
+) -> None:
+    fig.clf()
     fig.suptitle("SGOV 6-Month Risk-Free Proxy: Submission Report", fontsize=18, fontweight="bold", y=0.97)
 
     body_lines = [
@@ -90,77 +113,123 @@ def page_overview(pdf: PdfPages, author: str, declaration: str, latest_date: str
     fig.text(0.06, 0.88, _wrapped(body_lines), fontsize=11, va="top", family="monospace")
     fig.text(0.06, 0.04, "Supporting files: sgov_rf_6m.py, README.md, out/, sample_output.txt", fontsize=9)
     pdf.savefig(fig)
-    plt.close(fig)
-
 
-def page_chart(pdf: PdfPages, df: pd.DataFrame) -> None:
-    plot_df = df.copy()
-    plot_df["Date"] = pd.to_datetime(plot_df["Date"])
 
-    fig, ax = plt.subplots(figsize=(11, 8.5))
-    ax.plot(plot_df["Date"], plot_df["rf_6m_simple_clipped"], linewidth=1.8)
+def page_chart(pdf: PdfPages, fig: Figure, df: pd.DataFrame) -> None:
+    fig.clf()
+    ax = fig.subplots()
+    ax.plot(df["Date"].to_numpy(), df["rf_6m_simple_clipped"].to_numpy(), linewidth=1.8)
     ax.set_title("SGOV 6M Risk-Free Proxy (Simple Return, Clipped at 0)", fontsize=15)
     ax.set_xlabel("Date")
     ax.set_ylabel("6M simple return")
     ax.grid(alpha=0.25)
     fig.tight_layout()
     pdf.savefig(fig)
-    plt.close(fig)
 
 
-def page_terminal_output(pdf: PdfPages, output_text: str) -> None:
-    fig = plt.figure(figsize=(11, 8.5))
-    fig.suptitle("Terminal Run Output", fontsize=16, fontweight="bold", y=0.97)
+def page_terminal_output(pdf: PdfPages, fig: Figure, output_text: str) -> None:
+    lines = output_text.strip().splitlines() or ["No terminal output captured."]
+    page_chunks = [
+        lines[i : i + TERMINAL_LINES_PER_PAGE] for i in range(0, len(lines), TERMINAL_LINES_PER_PAGE)
+    ]
 
-    display_text = output_text.strip() or "No terminal output captured."
-    fig.text(
-        0.06,
-        0.9,
-        display_text,
-        fontsize=10,
-        va="top",
-        family="monospace",
-    )
-    pdf.savefig(fig)
-    plt.close(fig)
+    for page_num, chunk in enumerate(page_chunks, start=1):
+        title = "Terminal Run Output"
+        if len(page_chunks) > 1:
+            title += f" ({page_num}/{len(page_chunks)})"
+
+        fig.clf()
+        fig.suptitle(title, fontsize=16, fontweight="bold", y=0.97)
+        fig.text(
+            0.06,
+            0.9,
+            "\n".join(chunk),
+            fontsize=10,
+            va="top",
+            family="monospace",
+        )
+        pdf.savefig(fig)
 
 
-def main() -> None:
-    args = parse_args()
-    project_dir = Path(args.project_dir).resolve()
-    out_dir = project_dir / "out"
+def load_latest(out_dir: Path) -> tuple[str, float]:
+    # Latest snapshot is used on the overview page.
+    # Prefer the JSON copy (no parsing machinery) and fall back to CSV.
+    latest_json = out_dir / "rf_latest.json"
+    if latest_json.exists():
+        latest = json.loads(latest_json.read_bytes())
+        return str(latest["Date"]), float(latest["rf_6m_simple_clipped"])
 
     latest_csv = require_file(out_dir / "rf_latest.csv")
-    full_csv = require_file(out_dir / "sgov_rf_6m.csv")
-    sample_output_path = require_file(project_dir / "sample_output.txt")
-
-    # Latest snapshot is used on the overview page.
-    latest_df = pd.read_csv(latest_csv)
+    latest_df = pd.read_csv(
+        latest_csv,
+        dtype={"Date": str, "rf_6m_simple_clipped": "float64"},
+        engine="c",
+    )
     if latest_df.empty:
         raise SystemExit(f"No rows found in {latest_csv}")
 
     latest_row = latest_df.iloc[-1]
-    latest_date = str(latest_row["Date"])
-    latest_value = float(latest_row["rf_6m_simple_clipped"])
+    return str(latest_row["Date"]), float(latest_row["rf_6m_simple_clipped"])
 
+
+def load_history(out_dir: Path) -> pd.DataFrame:
     # Full history is used for the time-series chart page.
-    full_df = pd.read_csv(full_csv)
+    # Prefer the Parquet copy (typed, no text parsing) and fall back to CSV.
+    full_parquet = out_dir / "sgov_rf_6m.parquet"
+    if full_parquet.exists():
+        full_path = full_parquet
+        full_df = pd.read_parquet(full_path)
+    else:
+        full_path = require_file(out_dir / "sgov_rf_6m.csv")
+        full_df = pd.read_csv(full_path, dtype=FULL_CSV_DTYPES, parse_dates=["Date"], engine="c")
     if full_df.empty:
-        raise SystemExit(f"No rows found in {full_csv}")
+        raise SystemExit(f"No rows found in {full_path}")
+    return full_df
+
+
+def load_terminal_output(sample_output_path: Path) -> str:
+    # Keep only the tail of long logs, starting at a line boundary.
+    with sample_output_path.open("rb") as fh:
+        terminal_output = fh.read().decode("utf-8", errors="replace")
+    if len(terminal_output) > TERMINAL_OUTPUT_MAX_CHARS:
+        cut = len(terminal_output) - TERMINAL_OUTPUT_MAX_CHARS
+        tail = terminal_output[cut:]
+        # Drop a partial first line only; a tail without a later line break is kept whole.
+        if terminal_output[cut - 1] != "\n":
+            newline = tail.find("\n")
+            if 0 <= newline < len(tail) - 1:
+                tail = tail[newline + 1 :]
+        terminal_output = tail
+    return terminal_output
+
+
+def main() -> None:
+    args = parse_args()
+    project_dir = Path(args.project_dir).resolve()
+    out_dir = project_dir / "out"
+
+    sample_output_path = require_file(project_dir / "sample_output.txt")
 
-    terminal_output = sample_output_path.read_text(encoding="utf-8")
+    latest_date, latest_value = load_latest(out_dir)
+    full_df = load_history(out_dir)
+    terminal_output = load_terminal_output(sample_output_path)
 
     output_pdf = project_dir / args.output
+    # One letter-size figure is cleared and redrawn for every page. It is
+    # built without pyplot, so no global figure manager or GUI backend is involved.
+    fig = Figure(figsize=(11, 8.5))
+    FigureCanvasAgg(fig)
     with PdfPages(output_pdf) as pdf:
         page_overview(
             pdf=pdf,
+            fig=fig,
             author=args.author,
             declaration=args.declaration,
             latest_date=latest_date,
             latest_value=latest_value,
         )
-        page_chart(pdf=pdf, df=full_df)
-        page_terminal_output(pdf=pdf, output_text=terminal_output)
+        page_chart(pdf=pdf, fig=fig, df=full_df)
+        page_terminal_output(pdf=pdf, fig=fig, output_text=terminal_output)
 
     print(f"PDF report generated: {output_pdf}")
 
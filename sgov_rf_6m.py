@@ -12,12 +12,17 @@ Method summary:
 from __future__ import annotations
 
 import argparse
+import json
+import time
 from datetime import date
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+CACHE_DIR = Path(".cache")
+RF_COLUMNS = ("daily_log_return", "rf_6m_log_raw", "rf_6m_simple_raw", "rf_6m_simple_clipped")
+
 
 def parse_args() -> argparse.Namespace:
     """Parse command line options for the SGOV 6M workflow."""
@@ -38,16 +43,53 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--out", default="out", help="Output folder")
     parser.add_argument("--plot", action="store_true", help="Save PNG chart")
+    parser.add_argument("--xlsx", action="store_true", help="Also save an Excel workbook")
     parser.add_argument("--debug", action="store_true", help="Print sample rows")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download prices instead of reusing the local .cache/ copy",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=24.0,
+        help="Maximum age in hours of a cached download before it is refreshed.",
+    )
     return parser.parse_args()
 
 
-def fetch_sgov(start: str, end: str) -> pd.DataFrame:
+def fetch_sgov(start: str, end: str, use_cache: bool = True, cache_ttl: float = 24.0) -> pd.DataFrame:
     """
     Stage 1: Download SGOV daily OHLCV data.
 
     Returns a dataframe with a standard (single-level) column layout.
+    Downloads are cached under .cache/ per (start, end) and reused while
+    younger than cache_ttl hours.
     """
+    cache_path = CACHE_DIR / f"sgov_{start}_{end}.parquet"
+    df = None
+    if use_cache and cache_path.exists():
+        age_hours = (time.time() - cache_path.stat().st_mtime) / 3600.0
+        if age_hours < cache_ttl:
+            print("[Stage 1/4] Loading cached SGOV prices...")
+            df = pd.read_parquet(cache_path)
+
+    if df is None:
+        df = _download_sgov(start, end)
+        if use_cache:
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                df.to_parquet(cache_path, index=False)
+            except ImportError:
+                print("[Stage 1/4] pyarrow not installed; download not cached.")
+
+    # Keep Date as datetime64 (midnight) so downstream steps stay vectorized.
+    df["Date"] = pd.to_datetime(df["Date"]).dt.normalize()
+    return df
+
+
+def _download_sgov(start: str, end: str) -> pd.DataFrame:
     try:
         import yfinance as yf
     except Exception as exc:
@@ -64,9 +106,7 @@ def fetch_sgov(start: str, end: str) -> pd.DataFrame:
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.get_level_values(0)
 
-    df = df.reset_index()
-    df["Date"] = pd.to_datetime(df["Date"]).dt.date
-    return df
+    return df.reset_index()
 
 
 def compute_rf_6m(df: pd.DataFrame, window: int) -> pd.DataFrame:
@@ -88,83 +128,160 @@ def compute_rf_6m(df: pd.DataFrame, window: int) -> pd.DataFrame:
         raise SystemExit("Could not find 'Adj Close' or 'Close' in downloaded data.")
 
     print("[Stage 2/4] Computing rolling 6M risk-free proxy...")
-    working = df[["Date", price_col]].copy()
-    working = working.sort_values("Date").reset_index(drop=True)
+    # Build a fresh frame from the two needed columns rather than copying a slice.
+    working = pd.DataFrame(
+        {"Date": df["Date"].to_numpy(), price_col: df[price_col].to_numpy(dtype=np.float64)}
+    )
+    # yfinance already returns ascending dates; only sort when it does not.
+    if not working["Date"].is_monotonic_increasing:
+        working = working.sort_values("Date", kind="mergesort").reset_index(drop=True)
+
+    # ln(P_t / P_(t-1)) = ln(P_t) - ln(P_(t-1)): one log per price, no division.
+    lp = np.log(working[price_col].to_numpy())
+    lr = np.empty_like(lp)
+    lr[0] = np.nan
+    lr[1:] = lp[1:] - lp[:-1]
+    working["daily_log_return"] = lr
 
-    # Convert selected price column to float once and reuse.
-    px = working[price_col].astype(float)
-    working["daily_log_return"] = np.log(px / px.shift(1))
     # 126 trading days is the standard 6-month approximation used here.
-    working["rf_6m_log_raw"] = working["daily_log_return"].rolling(
-        window=window, min_periods=window
-    ).sum()
-    working["rf_6m_simple_raw"] = np.exp(working["rf_6m_log_raw"]) - 1.0
+    # Window sums come from cumulative-sum differences; windows touching a
+    # missing return stay NaN, matching rolling(min_periods=window).
+    rf_log = np.full_like(lr, np.nan)
+    if len(lr) > window:
+        cs = np.nancumsum(lr)
+        gaps = np.cumsum(np.isnan(lr))
+        rf_log[window:] = cs[window:] - cs[:-window]
+        rf_log[window:][gaps[window:] - gaps[:-window] > 0] = np.nan
+    # expm1 is exp(x) - 1 in one pass, and more accurate for small returns.
+    rf_simple = np.expm1(rf_log)
+    working["rf_6m_log_raw"] = rf_log
+    working["rf_6m_simple_raw"] = rf_simple
 
     # Clipping prevents negative risk-free proxy outputs for presentation purposes.
-    working["rf_6m_simple_clipped"] = working["rf_6m_simple_raw"].clip(lower=0.0)
+    working["rf_6m_simple_clipped"] = np.maximum(rf_simple, 0.0)
 
     # Rows before the first complete rolling window do not have 6M values.
     working = working.dropna(subset=["rf_6m_simple_raw"]).reset_index(drop=True)
-    return working
 
+    # Math above runs in float64; float32 still carries ample precision for
+    # the 6-decimal outputs and halves the stored size of these columns.
+    return working.astype({c: np.float32 for c in RF_COLUMNS})
+
+
+def output_float(value: float) -> float:
+    """Return a float32 rf value as the Python float with the same decimal digits as the CSV."""
+    # Widening float32 directly invents trailing digits (0.019528424 -> 0.01952842436...).
+    return float(str(np.float32(value)))
+
+
+def write_xlsx(df: pd.DataFrame, xlsx_path: Path) -> None:
+    """Stream rows into a write-only workbook instead of building a full cell grid."""
+    try:
+        from openpyxl import Workbook
+    except Exception as exc:
+        raise SystemExit(
+            "Missing dependency openpyxl. Run: pip install -r requirements.txt"
+        ) from exc
 
-def save_outputs(df: pd.DataFrame, out_dir: Path, make_plot: bool) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(list(df.columns))
+    # Write calendar dates, not midnight datetimes, so cells keep a date-only format,
+    # and rf values with the same digits as the CSV.
+    rows = df.assign(Date=df["Date"].dt.date)
+    for col in RF_COLUMNS:
+        rows[col] = rows[col].map(output_float)
+    for row in rows.itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(xlsx_path)
+
+
+def save_outputs(df: pd.DataFrame, out_dir: Path, make_plot: bool, make_xlsx: bool = False) -> None:
     """Stage 3: Save tabular outputs, latest-value summary, and optional chart."""
     print("[Stage 3/4] Writing output files...")
     out_dir.mkdir(parents=True, exist_ok=True)
 
     csv_path = out_dir / "sgov_rf_6m.csv"
+    parquet_path = out_dir / "sgov_rf_6m.parquet"
     xlsx_path = out_dir / "sgov_rf_6m.xlsx"
     latest_txt = out_dir / "rf_latest.txt"
     latest_csv = out_dir / "rf_latest.csv"
+    latest_json = out_dir / "rf_latest.json"
 
-    df.to_csv(csv_path, index=False)
-    df.to_excel(xlsx_path, index=False)
+    # Chunked writes bound peak memory on long histories.
+    df.to_csv(csv_path, index=False, chunksize=50_000)
+    # Typed binary copy for the report builder; CSV stays the portable format.
+    try:
+        df.to_parquet(parquet_path, index=False)
+    except ImportError:
+        print("[Stage 3/4] pyarrow not installed; skipping Parquet output.")
+        # The report prefers Parquet, so an older copy must not outlive this run.
+        parquet_path.unlink(missing_ok=True)
+    # openpyxl and matplotlib are imported only inside the optional branches
+    # below, so the default run never pays their import cost.
+    if make_xlsx:
+        write_xlsx(df, xlsx_path)
 
     # Persist a one-row latest snapshot for quick downstream consumption.
     last = df.iloc[-1]
-    latest_df = pd.DataFrame(
-        [
+    latest_value = output_float(last["rf_6m_simple_clipped"])
+    # Written directly; a one-row DataFrame is all overhead for two values.
+    latest_csv.write_text(
+        "Date,rf_6m_simple_clipped\n{date},{value!r}\n".format(
+            date=last["Date"].date(), value=latest_value
+        ),
+        encoding="utf-8",
+    )
+
+    # JSON copy lets the report builder read the snapshot without a CSV parse.
+    latest_json.write_text(
+        json.dumps(
             {
-                "Date": last["Date"],
-                "rf_6m_simple_clipped": float(last["rf_6m_simple_clipped"]),
+                "Date": last["Date"].date().isoformat(),
+                "rf_6m_simple_clipped": latest_value,
             }
-        ]
+        ),
+        encoding="utf-8",
     )
-    latest_df.to_csv(latest_csv, index=False)
 
     latest_txt.write_text(
         "Date: {date}\nrf_6m_simple_clipped: {value:.6f}\n".format(
-            date=last["Date"], value=float(last["rf_6m_simple_clipped"])
+            date=last["Date"].date(), value=latest_value
         ),
         encoding="utf-8",
     )
 
     if make_plot:
-        import matplotlib.pyplot as plt
-
-        plt.figure(figsize=(9, 4.5))
-        plt.plot(df["Date"], df["rf_6m_simple_clipped"], linewidth=1.6)
-        plt.title("SGOV 6M Risk-Free Proxy (Simple Return, Clipped at 0)")
-        plt.xlabel("Date")
-        plt.ylabel("6M simple return")
-        plt.tight_layout()
-        plt.savefig(out_dir / "sgov_rf_6m.png", dpi=200)
-        plt.close()
+        # A bare Figure renders straight to PNG without pyplot, so the
+        # caller's matplotlib backend (e.g. a notebook's inline one) is untouched.
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(9, 4.5))
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
+        ax.plot(df["Date"], df["rf_6m_simple_clipped"], linewidth=1.6)
+        ax.set_title("SGOV 6M Risk-Free Proxy (Simple Return, Clipped at 0)")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("6M simple return")
+        fig.tight_layout()
+        fig.savefig(out_dir / "sgov_rf_6m.png", dpi=200)
 
 
 def print_summary(df: pd.DataFrame, out_dir: Path) -> None:
     """Stage 4: Print final summary to terminal for quick reporting."""
     last = df.iloc[-1]
     print("[Stage 4/4] Completed successfully")
-    print(f"Latest date: {last['Date']}")
+    print(f"Latest date: {last['Date'].date()}")
     print(f"Latest rf_6m_simple_clipped: {float(last['rf_6m_simple_clipped']):.6f}")
     print(f"Outputs saved in: {out_dir.resolve()}")
 
 
 def main() -> None:
     args = parse_args()
-    df_raw = fetch_sgov(args.start, args.end)
+    df_raw = fetch_sgov(
+        args.start, args.end, use_cache=not args.no_cache, cache_ttl=args.cache_ttl
+    )
     df_rf = compute_rf_6m(df_raw, args.window)
 
     if args.debug:
@@ -174,7 +291,7 @@ def main() -> None:
         print(df_rf.tail(3))
 
     out_dir = Path(args.out)
-    save_outputs(df_rf, out_dir=out_dir, make_plot=args.plot)
+    save_outputs(df_rf, out_dir=out_dir, make_plot=args.plot, make_xlsx=args.xlsx)
     print_summary(df_rf, out_dir=out_dir)
 
 